@@ -0,0 +1,70 @@
+from numba import njit
+import numpy as np
+from typing import Tuple
+
+
+@njit(cache=True, inline='always')
+def _worse(score_a, index_a, score_b, index_b):
+    # Lower score ranks worse; on ties the later index does, matching a stable sort
+    return score_a < score_b or (score_a == score_b and index_a > index_b)
+
+
+@njit(cache=True)
+def _sift_down(heap_scores, heap_indices, size, score, index):
+    pos = 0
+    while True:
+        child = 2 * pos + 1
+        if child >= size:
+            break
+        if child + 1 < size and _worse(heap_scores[child + 1], heap_indices[child + 1],
+                                       heap_scores[child], heap_indices[child]):
+            child += 1
+        if not _worse(heap_scores[child], heap_indices[child], score, index):
+            break
+        heap_scores[pos] = heap_scores[child]
+        heap_indices[pos] = heap_indices[child]
+        pos = child
+    heap_scores[pos] = score
+    heap_indices[pos] = index
+
+
+@njit(cache=True)
+def topk_above(sims: np.ndarray, thresh: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the k best similarities >= thresh, best first"""
+    heap_scores = np.empty(k, dtype=sims.dtype)
+    heap_indices = np.empty(k, dtype=np.int64)
+    size = 0
+    
+    # Min-heap of the best k seen so far; the root is the worst kept entry
+    for i in range(sims.shape[0]):
+        score = sims[i]
+        if score < thresh:
+            continue
+        if size < k:
+            pos = size
+            size += 1
+            while pos > 0:
+                parent = (pos - 1) // 2
+                if not _worse(score, i, heap_scores[parent], heap_indices[parent]):
+                    break
+                heap_scores[pos] = heap_scores[parent]
+                heap_indices[pos] = heap_indices[parent]
+                pos = parent
+            heap_scores[pos] = score
+            heap_indices[pos] = i
+        elif size > 0 and _worse(heap_scores[0], heap_indices[0], score, i):
+            _sift_down(heap_scores, heap_indices, size, score, i)
+    
+    # Pop the worst entry into the back of the output until the heap is empty
+    out_scores = np.empty(size, dtype=sims.dtype)
+    out_indices = np.empty(size, dtype=np.int64)
+    for j in range(size - 1, -1, -1):
+        out_scores[j] = heap_scores[0]
+        out_indices[j] = heap_indices[0]
+        if j > 0:
+            _sift_down(heap_scores, heap_indices, j, heap_scores[j], heap_indices[j])
+    return out_indices, out_scores
+
+
+# Compile (or load from the on-disk cache) at import, not on the first request
+topk_above(np.zeros(1, dtype=np.float32), np.float32(0.0), 1)
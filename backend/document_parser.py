@@ -1,210 +1,554 @@
+import ahocorasick
 import docx
-import PyPDF2
 import re
-from typing import Dict, List, Optional
+import os
+import hashlib
+import io
+import mmap
+import tempfile
+import time
+import zipfile
+from lxml import etree
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 import logging
 
+# pypdfium2 is far faster than PyPDF2; fall back where the native wheel is unavailable
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+    import PyPDF2
+
+# Part of the parse cache key: the two backends lay out text differently
+PDF_BACKEND = 'pdfium' if pdfium is not None else 'pypdf2'
+
 logger = logging.getLogger(__name__)
 
-class DocumentParser:
-    """Parse DOCX and PDF documents to extract text content"""
-    
-    @staticmethod
-    def parse_docx(file_path: str) -> str:
-        """Extract text from DOCX file"""
-        try:
-            doc = docx.Document(file_path)
-            text = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text.append(paragraph.text)
-            return "\n".join(text)
-        except Exception as e:
-            logger.error(f"Error parsing DOCX: {str(e)}")
-            raise
-    
-    @staticmethod
-    def parse_pdf(file_path: str) -> str:
-        """Extract text from PDF file"""
-        try:
-            text = []
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text.append(page_text)
-            return "\n".join(text)
-        except Exception as e:
-            logger.error(f"Error parsing PDF: {str(e)}")
-            raise
-    
-    @staticmethod
-    def parse_document(file_path: str) -> str:
-        """Parse document based on file extension"""
-        if file_path.lower().endswith('.docx'):
-            return DocumentParser.parse_docx(file_path)
-        elif file_path.lower().endswith('.pdf'):
-            return DocumentParser.parse_pdf(file_path)
+# Parsers accept a file path or the document's bytes already in memory
+DocumentSource = Union[str, bytes]
+
+# On-disk cache of extracted document text; bump the version whenever parser
+# output changes so stale entries are not served. Entries hold the plain text
+# of confidential uploads, so they expire, the directory is capped in size,
+# and PARSE_CACHE_ENABLED=0 turns the cache off entirely
+PARSE_CACHE_DIR = Path(os.environ.get('PARSE_CACHE_DIR', Path.home() / '.cache' / 'creator_pulse' / 'parsed'))
+PARSE_CACHE_VERSION = 4
+PARSE_CACHE_ENABLED = os.environ.get('PARSE_CACHE_ENABLED', '1') != '0'
+PARSE_CACHE_MAX_AGE_SECONDS = float(os.environ.get('PARSE_CACHE_MAX_AGE_SECONDS', 7 * 24 * 3600))
+PARSE_CACHE_MAX_BYTES = int(os.environ.get('PARSE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# WordprocessingML tags used when streaming DOCX text
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W_NS + 'body'
+_W_P = _W_NS + 'p'
+_W_TBL = _W_NS + 'tbl'
+_W_RUN_TEXT = {
+    _W_NS + 'tab': '\t',
+    _W_NS + 'ptab': '\t',
+    _W_NS + 'cr': '\n',
+    _W_NS + 'noBreakHyphen': '-',
+}
+_W_BR = _W_NS + 'br'
+_W_BR_TYPE = _W_NS + 'type'
+_W_T = _W_NS + 't'
+_W_RUN_CHILDREN = etree.XPath(
+    './w:r/*|./w:hyperlink/w:r/*',
+    namespaces={'w': _W_NS[1:-1]}
+)
+
+# Entity extraction patterns, compiled once at import time. They are written
+# in lowercase and matched case-sensitively against lowercased text, which is
+# cheaper for the regex engine than re.IGNORECASE
+# More specific patterns - allow text between capital and QAR. The lookahead
+# requires at least six significant digits, rejecting amounts below the
+# realistic minimum of QAR 100,000 inside the regex engine
+_CAPITAL_AMOUNT = r'((?=[0,]*[1-9](?:,*\d){5})[\d,]+)'
+_PAID_UP_RE = re.compile(r'paid[\s-]?up\s+capital[:\s.]+[^q]*?qar\s*' + _CAPITAL_AMOUNT)
+_AUTH_RE = re.compile(r'authorized\s+(?:share\s+)?capital[:\s.]+[^q]*?qar\s*' + _CAPITAL_AMOUNT)
+
+# Common cloud providers and locations
+_LOCATION_RES = [re.compile(p) for p in (
+    r'(?:aws|amazon|azure|google cloud|gcp).*?(?:in|region[s]?)\s+([a-z\s,]+)',
+    r'server[s]?.*?(?:located|hosted|stored).*?(?:in|at)\s+([a-z\s,]+)',
+    r'data.*?(?:stored|hosted|processed).*?(?:in|at)\s+([a-z\s,]+)',
+    r'(?:ireland|singapore|qatar|uae|dubai|usa|europe|asia)'
+)]
+
+# Patterns to detect compliance officer
+_OFFICER_POS_RES = [re.compile(p) for p in (
+    r'compliance\s+officer[:\s]+([\w\s\.]+)',
+    r'(?:appointed|designated).*?compliance\s+officer',
+    r'(?:mr\.|mrs\.|ms\.|dr\.)\s+[\w\s]+.*?compliance\s+officer'
+)]
+# Only presence matters for negatives, so they are folded into one alternation
+_OFFICER_NEG_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'no.*?compliance\s+officer',
+    r'without.*?compliance\s+officer',
+    r'compliance\s+officer.*?(?:pending|under review|not yet|will be)',
+    r'interim.*?compliance'
+)))
+
+# AML policy patterns, scanned in one pass. Every alternative is a zero-width
+# lookahead starting at a distinct literal, so no signal can mask another;
+# policy and approval wording following "aml" are captured together
+_AML_SIGNALS_RE = re.compile(
+    r'(?=aml(?:(?=.*?(?P<policy>policy|policies)))?(?:(?=.*?(?P<approved>board[\s-]?approved)))?)'
+    r'|(?=(?P<board_approved>board[\s-]?approved.*?aml))'
+    r'|(?=(?P<review>under review|pending|draft))'
+    r'|(?=(?P<monitoring>(?:transaction|automated)\s+monitoring|monitoring\s+system))'
+)
+_AML_POLICY = 1
+_AML_APPROVED = 2
+_AML_REVIEW = 4
+_AML_MONITORING = 8
+_AML_ALL = _AML_POLICY | _AML_APPROVED | _AML_REVIEW | _AML_MONITORING
+_AML_SIGNAL_FLAGS = (
+    ('policy', _AML_POLICY),
+    ('approved', _AML_APPROVED),
+    ('board_approved', _AML_APPROVED),
+    ('review', _AML_REVIEW),
+    ('monitoring', _AML_MONITORING),
+)
+
+# Business category keywords, checked in priority order
+_CATEGORY_KEYWORDS = (
+    ('Category 2', ['p2p', 'peer-to-peer', 'lending', 'crowdfunding', 'marketplace lending']),
+    ('Category 1', ['payment', 'psp', 'electronic money', 'payment service']),
+    ('Category 3', ['wealth management', 'robo-advisor', 'investment advice', 'portfolio management']),
+)
+_CATEGORY_PRIORITY = {category: rank for rank, (category, _) in enumerate(_CATEGORY_KEYWORDS)}
+
+# Single automaton over every keyword so the text is scanned once
+_CATEGORY_AC = ahocorasick.Automaton()
+for _category, _keywords in _CATEGORY_KEYWORDS:
+    for _keyword in _keywords:
+        _CATEGORY_AC.add_word(_keyword, _category)
+_CATEGORY_AC.make_automaton()
+
+
+# Parse DOCX and PDF documents to extract text content
+
+
+def _paragraph_text(paragraph) -> str:
+    """Text of a <w:p> element, following python-docx's run text rules"""
+    parts = []
+    for child in _W_RUN_CHILDREN(paragraph):
+        if child.tag == _W_T:
+            parts.append(child.text or '')
+        elif child.tag == _W_BR:
+            if child.get(_W_BR_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
         else:
-            raise ValueError(f"Unsupported file format: {file_path}")
+            parts.append(_W_RUN_TEXT.get(child.tag, ''))
+    return ''.join(parts)
 
 
-class EntityExtractor:
-    """Extract key entities from startup documents"""
-    
-    @staticmethod
-    def extract_capital(text: str) -> Optional[Dict]:
-        """Extract capital information"""
-        capital_info = {
-            'authorized_capital': None,
-            'paid_up_capital': None
-        }
-        
-        # More specific patterns - allow text between capital and QAR
-        paid_up_pattern = r'paid[\s-]?up\s+capital[:\s.]+[^Q]*?(?:QAR|qar)\s*([\d,]+)'
-        authorized_pattern = r'authorized\s+(?:share\s+)?capital[:\s.]+[^Q]*?(?:QAR|qar)\s*([\d,]+)'
-        
-        # Extract paid-up capital
-        paid_matches = re.finditer(paid_up_pattern, text, re.IGNORECASE)
-        for match in paid_matches:
-            amount_str = match.group(1).replace(',', '')
-            try:
-                amount = float(amount_str)
-                if amount >= 100000:  # Realistic minimum
-                    capital_info['paid_up_capital'] = amount
-                    break
-            except ValueError:
+def _as_file(source: DocumentSource) -> Union[str, BinaryIO]:
+    """Paths are opened by the parsers themselves; bytes are wrapped in a stream"""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def _stream_docx(source: DocumentSource) -> str:
+    """Stream body paragraphs from word/document.xml without building a python-docx tree"""
+    text = []
+    with zipfile.ZipFile(_as_file(source)) as archive, archive.open('word/document.xml') as xml:
+        for _, element in etree.iterparse(xml, events=('end',), tag=(_W_P, _W_TBL)):
+            parent = element.getparent()
+            if parent is None or parent.tag != _W_BODY:
                 continue
+            if element.tag == _W_P:
+                paragraph_text = _paragraph_text(element)
+                if paragraph_text.strip():
+                    text.append(paragraph_text)
+            # Drop processed body children to keep memory flat
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+    return "\n".join(text)
+
+
+def parse_docx(source: DocumentSource) -> str:
+    """Extract text from DOCX file (path or bytes)"""
+    try:
+        try:
+            return _stream_docx(source)
+        except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+            logger.warning(f"Streaming DOCX parse failed, falling back to python-docx: {str(e)}")
         
-        # Extract authorized capital
-        auth_matches = re.finditer(authorized_pattern, text, re.IGNORECASE)
-        for match in auth_matches:
-            amount_str = match.group(1).replace(',', '')
-            try:
-                amount = float(amount_str)
-                if amount >= 100000:
-                    capital_info['authorized_capital'] = amount
-                    break
-            except ValueError:
-                continue
+        doc = docx.Document(_as_file(source))
+        text = []
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                text.append(paragraph.text)
+        return "\n".join(text)
+    except Exception as e:
+        logger.error(f"Error parsing DOCX: {str(e)}")
+        raise
+
+
+def _pdfium_page_texts(source: DocumentSource) -> List[str]:
+    """Extract text of every page with pdfium"""
+    pdf = pdfium.PdfDocument(source)
+    try:
+        text = []
+        for index in range(len(pdf)):
+            # pdfium reports CRLF line breaks; normalize to match other parsers
+            page_text = pdf[index].get_textpage().get_text_range().replace('\r\n', '\n')
+            if page_text:
+                text.append(page_text)
+        return text
+    finally:
+        pdf.close()
+
+
+def _pypdf2_page_texts(stream: Any) -> List[str]:
+    """Extract text of every page with PyPDF2"""
+    pdf_reader = PyPDF2.PdfReader(stream)
+    text = []
+    for page in pdf_reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text.append(page_text)
+    return text
+
+
+def parse_pdf(source: DocumentSource) -> str:
+    """Extract text from PDF file (path or bytes)"""
+    try:
+        if pdfium is not None:
+            text = _pdfium_page_texts(source)
+        elif isinstance(source, str):
+            # PyPDF2 seeks around the file constantly; reading through a
+            # memory map lets the OS page in only the objects it touches
+            with open(source, 'rb') as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = _pypdf2_page_texts(mapped)
+        else:
+            text = _pypdf2_page_texts(io.BytesIO(source))
         
-        return capital_info if any(capital_info.values()) else None
+        # Every page ends in a newline, as PyPDF2 usually emits, so pages are
+        # joined with a blank line: semantic analysis chunks on blank lines
+        return "\n".join(page if page.endswith('\n') else page + '\n' for page in text)
+    except Exception as e:
+        logger.error(f"Error parsing PDF: {str(e)}")
+        raise
+
+
+def _cache_key(source: DocumentSource) -> str:
+    """Hash file contents so identical uploads share a cache entry"""
+    digest = hashlib.blake2b(f"v{PARSE_CACHE_VERSION}|{PDF_BACKEND}|".encode(), digest_size=32)
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        digest.update(source)
+    return digest.hexdigest()
+
+
+def _read_cache(key: str) -> Optional[str]:
+    path = PARSE_CACHE_DIR / f"{key}.txt"
+    try:
+        with open(path, encoding='utf-8', newline='') as cached:
+            if time.time() - os.fstat(cached.fileno()).st_mtime > PARSE_CACHE_MAX_AGE_SECONDS:
+                os.unlink(path)
+                return None
+            return cached.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Error reading parse cache: {str(e)}")
+        return None
+
+
+def _write_cache(key: str, text: str) -> None:
+    try:
+        PARSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=PARSE_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as tmp:
+            tmp.write(text)
+        # Atomic rename keeps concurrent writers from exposing partial files
+        os.replace(tmp_path, PARSE_CACHE_DIR / f"{key}.txt")
+    except (OSError, UnicodeError) as e:
+        logger.warning(f"Error writing parse cache: {str(e)}")
+        return
+    _prune_cache()
+
+
+def _prune_cache() -> None:
+    """Drop expired entries, then the oldest ones until the cache fits its size cap"""
+    entries = []
+    try:
+        with os.scandir(PARSE_CACHE_DIR) as scan:
+            for entry in scan:
+                if entry.name.endswith('.txt'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError as e:
+        logger.warning(f"Error pruning parse cache: {str(e)}")
+        return
     
-    @staticmethod
-    def extract_data_location(text: str) -> Optional[List[str]]:
-        """Extract data storage locations"""
-        locations = []
-        
-        # Common cloud providers and locations
-        location_patterns = [
-            r'(?:AWS|Amazon|Azure|Google Cloud|GCP).*?(?:in|region[s]?)\s+([A-Za-z\s,]+)',
-            r'server[s]?.*?(?:located|hosted|stored).*?(?:in|at)\s+([A-Za-z\s,]+)',
-            r'data.*?(?:stored|hosted|processed).*?(?:in|at)\s+([A-Za-z\s,]+)',
-            r'(?:Ireland|Singapore|Qatar|UAE|Dubai|USA|Europe|Asia)'
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                location = match.group(1) if match.lastindex else match.group(0)
-                location = location.strip()
-                if location and len(location) > 2:
-                    locations.append(location)
-        
-        return list(set(locations)) if locations else None
-    
-    @staticmethod
-    def extract_compliance_officer(text: str) -> Optional[Dict]:
-        """Extract compliance officer information"""
-        officer_info = {
-            'has_officer': False,
-            'details': None
+    # Newest first, so entries that no longer fit under the cap are the oldest
+    entries.sort(reverse=True)
+    now = time.time()
+    total = 0
+    for mtime, size, path in entries:
+        if now - mtime <= PARSE_CACHE_MAX_AGE_SECONDS and total + size <= PARSE_CACHE_MAX_BYTES:
+            total += size
+            continue
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Error pruning parse cache: {str(e)}")
+
+
+def _parser_for(filename: str) -> Callable[[DocumentSource], str]:
+    if filename.lower().endswith('.docx'):
+        return parse_docx
+    elif filename.lower().endswith('.pdf'):
+        return parse_pdf
+    raise ValueError(f"Unsupported file format: {filename}")
+
+
+def _parse_cached(parser: Callable[[DocumentSource], str], source: DocumentSource) -> str:
+    if not PARSE_CACHE_ENABLED:
+        return parser(source)
+    key = _cache_key(source)
+    text = _read_cache(key)
+    if text is None:
+        text = parser(source)
+        _write_cache(key, text)
+    return text
+
+
+def parse_document(file_path: str) -> str:
+    """Parse document based on file extension, reusing cached text if unchanged"""
+    return _parse_cached(_parser_for(file_path), file_path)
+
+
+def parse_stream(fileobj: BinaryIO, filename: str) -> str:
+    """Parse an open binary stream (e.g. an upload) without writing it to disk"""
+    parser = _parser_for(filename)
+    return _parse_cached(parser, fileobj.read())
+
+
+def parse_many(file_paths: List[str]) -> Dict[str, str]:
+    """Parse several documents in parallel processes, skipping ones that fail"""
+    parsed = {}
+    workers = min(os.cpu_count() or 1, len(file_paths))
+    if workers <= 1:
+        for file_path in file_paths:
+            try:
+                parsed[file_path] = parse_document(file_path)
+            except Exception as e:
+                logger.error(f"Error parsing {file_path}: {str(e)}")
+        return parsed
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            file_path: executor.submit(parse_document, file_path)
+            for file_path in file_paths
         }
-        
-        # Patterns to detect compliance officer
-        positive_patterns = [
-            r'compliance\s+officer[:\s]+([\w\s\.]+)',
-            r'(?:appointed|designated).*?compliance\s+officer',
-            r'(?:Mr\.|Mrs\.|Ms\.|Dr\.)\s+[\w\s]+.*?compliance\s+officer'
-        ]
-        
-        negative_patterns = [
-            r'no.*?compliance\s+officer',
-            r'without.*?compliance\s+officer',
-            r'compliance\s+officer.*?(?:pending|under review|not yet|will be)',
-            r'interim.*?compliance'
-        ]
-        
-        # Check negative patterns first
-        for pattern in negative_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                officer_info['has_officer'] = False
-                officer_info['details'] = 'No dedicated compliance officer found'
-                return officer_info
-        
-        # Check positive patterns
-        for pattern in positive_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                officer_info['has_officer'] = True
-                officer_info['details'] = match.group(0)
-                return officer_info
-        
+        for file_path, future in futures.items():
+            try:
+                parsed[file_path] = future.result()
+            except Exception as e:
+                logger.error(f"Error parsing {file_path}: {str(e)}")
+    return parsed
+
+
+# Extract key entities from startup documents
+
+# Literal anchors each extractor needs in order to match anything; scanned
+# in a single pass so extractors without anchors in the text are skipped.
+# Each group sits in a lookahead so matches consume nothing: overlapping
+# anchors ("data" in "metadataml") must not hide each other.
+_MASTER_RE = re.compile(
+    r'(?=(?P<capital>paid[\s-]?up\s+capital|authorized\s+(?:share\s+)?capital))'
+    r'|(?=(?P<data_locations>aws|amazon|azure|google cloud|gcp|server|data'
+    r'|ireland|singapore|qatar|uae|dubai|usa|europe|asia))'
+    r'|(?=(?P<compliance_officer>compliance))'
+    r'|(?=(?P<aml_policy>aml|monitoring))'
+)
+
+
+def extract_capital(text: str, text_lower: Optional[str] = None) -> Optional[Dict[str, Optional[float]]]:
+    """Extract capital information"""
+    if text_lower is None:
+        text_lower = text.lower()
+    
+    capital_info: Dict[str, Optional[float]] = {
+        'authorized_capital': None,
+        'paid_up_capital': None
+    }
+    
+    # Extract paid-up capital
+    match = _PAID_UP_RE.search(text_lower)
+    if match:
+        capital_info['paid_up_capital'] = float(match.group(1).replace(',', ''))
+    
+    # Extract authorized capital
+    match = _AUTH_RE.search(text_lower)
+    if match:
+        capital_info['authorized_capital'] = float(match.group(1).replace(',', ''))
+    
+    return capital_info if any(capital_info.values()) else None
+
+
+def extract_data_location(text: str, text_lower: Optional[str] = None) -> Optional[Tuple[str, ...]]:
+    """Extract data storage locations"""
+    if text_lower is None:
+        text_lower = text.lower()
+    
+    # Matches run on the lowercased text but report the original spelling,
+    # read from the same span whenever lowercasing kept offsets aligned
+    original = text if len(text) == len(text_lower) else text_lower
+    locations: Dict[str, str] = {}
+    
+    for pattern in _LOCATION_RES:
+        matches = pattern.finditer(text_lower)
+        for match in matches:
+            group = 1 if match.lastindex else 0
+            location = original[match.start(group):match.end(group)].strip()
+            if location and len(location) > 2:
+                # De-duplicated case-insensitively, preserving first-seen order
+                locations.setdefault(location.lower(), location)
+    
+    return tuple(locations.values()) if locations else None
+
+
+def extract_compliance_officer(text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
+    """Extract compliance officer information"""
+    if text_lower is None:
+        text_lower = text.lower()
+    
+    officer_info: Dict[str, Any] = {
+        'has_officer': False,
+        'details': None
+    }
+    
+    # Check negative patterns first
+    if _OFFICER_NEG_RE.search(text_lower):
+        officer_info['has_officer'] = False
+        officer_info['details'] = 'No dedicated compliance officer found'
         return officer_info
     
-    @staticmethod
-    def extract_aml_policy(text: str) -> Optional[Dict]:
-        """Extract AML policy information"""
-        policy_info = {
-            'has_policy': False,
-            'is_approved': False,
-            'has_monitoring': False,
-            'details': None
-        }
-        
-        # AML policy patterns
-        if re.search(r'AML.*?(?:policy|policies)', text, re.IGNORECASE):
-            policy_info['has_policy'] = True
-            
-            if re.search(r'board[\s-]?approved.*?AML|AML.*?board[\s-]?approved', text, re.IGNORECASE):
-                policy_info['is_approved'] = True
-            
-            if re.search(r'under review|pending|draft', text, re.IGNORECASE):
-                policy_info['is_approved'] = False
-                policy_info['details'] = 'AML policy under review'
-        
-        # Transaction monitoring
-        if re.search(r'(?:transaction|automated)\s+monitoring|monitoring\s+system', text, re.IGNORECASE):
-            policy_info['has_monitoring'] = True
-        
-        return policy_info
+    # Check positive patterns
+    for pattern in _OFFICER_POS_RES:
+        match = pattern.search(text_lower)
+        if match:
+            officer_info['has_officer'] = True
+            # Report the original casing when offsets line up; a few
+            # Unicode characters change length when lowercased
+            if len(text_lower) == len(text):
+                officer_info['details'] = text[match.start():match.end()]
+            else:
+                officer_info['details'] = match.group(0)
+            return officer_info
     
-    @staticmethod
-    def extract_business_category(text: str) -> Optional[str]:
-        """Determine business category based on services"""
+    return officer_info
+
+
+def extract_aml_policy(text: str, text_lower: Optional[str] = None) -> Dict[str, Any]:
+    """Extract AML policy information"""
+    if text_lower is None:
         text_lower = text.lower()
-        
-        if any(keyword in text_lower for keyword in ['p2p', 'peer-to-peer', 'lending', 'crowdfunding', 'marketplace lending']):
-            return 'Category 2'
-        elif any(keyword in text_lower for keyword in ['payment', 'psp', 'electronic money', 'payment service']):
-            return 'Category 1'
-        elif any(keyword in text_lower for keyword in ['wealth management', 'robo-advisor', 'investment advice', 'portfolio management']):
-            return 'Category 3'
-        
-        return None
     
-    @staticmethod
-    def extract_all_entities(documents: Dict[str, str]) -> Dict:
-        """Extract all entities from multiple documents"""
-        combined_text = "\n\n".join(documents.values())
-        
-        entities = {
-            'capital': EntityExtractor.extract_capital(combined_text),
-            'data_locations': EntityExtractor.extract_data_location(combined_text),
-            'compliance_officer': EntityExtractor.extract_compliance_officer(combined_text),
-            'aml_policy': EntityExtractor.extract_aml_policy(combined_text),
-            'business_category': EntityExtractor.extract_business_category(combined_text)
-        }
+    policy_info: Dict[str, Any] = {
+        'has_policy': False,
+        'is_approved': False,
+        'has_monitoring': False,
+        'details': None
+    }
+    
+    flags = 0
+    for match in _AML_SIGNALS_RE.finditer(text_lower):
+        for group, flag in _AML_SIGNAL_FLAGS:
+            if match.group(group) is not None:
+                flags |= flag
+        if flags == _AML_ALL:
+            break
+    
+    if flags & _AML_POLICY:
+        policy_info['has_policy'] = True
+        policy_info['is_approved'] = bool(flags & _AML_APPROVED)
         
-        return entities
+        if flags & _AML_REVIEW:
+            policy_info['is_approved'] = False
+            policy_info['details'] = 'AML policy under review'
+    
+    # Transaction monitoring
+    if flags & _AML_MONITORING:
+        policy_info['has_monitoring'] = True
+    
+    return policy_info
+
+
+def extract_business_category(text: str, text_lower: Optional[str] = None) -> Optional[str]:
+    """Determine business category based on services"""
+    if text_lower is None:
+        text_lower = text.lower()
+    
+    best: Optional[str] = None
+    for _, category in _CATEGORY_AC.iter(text_lower):
+        if best is None or _CATEGORY_PRIORITY[category] < _CATEGORY_PRIORITY[best]:
+            best = category
+            if _CATEGORY_PRIORITY[best] == 0:
+                break
+    
+    return best
+
+
+def extract_all_entities(documents: Dict[str, str]) -> Dict[str, Any]:
+    """Extract all entities from multiple documents"""
+    combined_text = "\n\n".join(documents.values())
+    combined_lower = combined_text.lower()
+    
+    dispatch = {
+        'capital': extract_capital,
+        'data_locations': extract_data_location,
+        'compliance_officer': extract_compliance_officer,
+        'aml_policy': extract_aml_policy
+    }
+    
+    found = set()
+    for match in _MASTER_RE.finditer(combined_lower):
+        found.add(match.lastgroup)
+        if len(found) == len(dispatch):
+            break
+    
+    # Extractors whose anchors are absent run on empty text, which
+    # yields their usual "nothing found" result without scanning
+    entities: Dict[str, Any] = {
+        key: extractor(combined_text, combined_lower) if key in found else extractor('', '')
+        for key, extractor in dispatch.items()
+    }
+    entities['business_category'] = extract_business_category(combined_text, combined_lower)
+    
+    return entities
+
+
+# Backwards-compatible namespaces for the former static-method classes
+DocumentParser = SimpleNamespace(
+    parse_docx=parse_docx,
+    parse_pdf=parse_pdf,
+    parse_document=parse_document,
+    parse_stream=parse_stream,
+    parse_many=parse_many
+)
+EntityExtractor = SimpleNamespace(
+    extract_capital=extract_capital,
+    extract_data_location=extract_data_location,
+    extract_compliance_officer=extract_compliance_officer,
+    extract_aml_policy=extract_aml_policy,
+    extract_business_category=extract_business_category,
+    extract_all_entities=extract_all_entities
+)
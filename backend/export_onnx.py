@@ -0,0 +1,89 @@
+"""
+Export all-MiniLM-L6-v2 to ONNX and quantize it to int8 for CPU inference
+
+Run once at build time (needs torch and onnx, not used at serving time):
+    python export_onnx.py [model_name_or_path] [output_dir]
+"""
+import sys
+from pathlib import Path
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from sentence_transformers import SentenceTransformer
+from onnx_encoder import ONNX_MODEL_DIR, ONNX_MODEL_FILE, OnnxSentenceEncoder
+
+# The int8 model must reproduce the PyTorch embeddings this closely (cosine
+# similarity) on every sample, including one past the truncation length
+MIN_COSINE_SIMILARITY = 0.99
+VALIDATION_SENTENCES = [
+    "Customer data is stored on AWS servers in Ireland and Singapore.",
+    "The board-approved AML policy requires automated transaction monitoring.",
+    "Paid-up capital: QAR 7,500,000. Authorized share capital: QAR 10,000,000.",
+    "Mr. Ahmed Ali has been appointed as the designated compliance officer.",
+    "Enhanced customer due diligence applies above QAR 10,000 per month. " * 40
+]
+
+
+class _HiddenStates(torch.nn.Module):
+    """Fixed positional signature for tracing, independent of the transformers version"""
+    
+    def __init__(self, transformer: torch.nn.Module):
+        super().__init__()
+        self.transformer = transformer
+    
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.transformer(input_ids=input_ids, attention_mask=attention_mask,
+                                token_type_ids=token_type_ids)[0]
+
+def export(model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', output_dir: Path = ONNX_MODEL_DIR) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = _HiddenStates(model[0].auto_model).eval()
+    
+    # Tokenizer with the model's truncation length baked in
+    tokenizer = model.tokenizer.backend_tokenizer
+    tokenizer.enable_truncation(model.max_seq_length)
+    tokenizer.no_padding()
+    tokenizer.save(str(output_dir / 'tokenizer.json'))
+    
+    sample = model.tokenizer(['export sample'], return_tensors='pt')
+    input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    
+    fp32_path = output_dir / 'model.onnx'
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False
+        )
+    
+    # Dynamic int8 quantization: int8 weights, activations quantized per batch,
+    # which maps onto VNNI dot-product instructions on modern x86
+    quantize_dynamic(str(fp32_path), str(output_dir / ONNX_MODEL_FILE),
+                     weight_type=QuantType.QInt8, per_channel=False, reduce_range=False)
+    fp32_path.unlink()
+    
+    similarity = validate(model, output_dir)
+    if similarity < MIN_COSINE_SIMILARITY:
+        # Don't leave a model behind that SemanticMapper would pick up
+        (output_dir / ONNX_MODEL_FILE).unlink()
+        sys.exit(f"Quantized model rejected: cosine similarity {similarity:.4f} "
+                 f"to {model_name} is below {MIN_COSINE_SIMILARITY}")
+    print(f"Quantized model written to {output_dir} (min cosine similarity {similarity:.4f})")
+
+
+def validate(model: SentenceTransformer, output_dir: Path) -> float:
+    """Lowest cosine similarity between PyTorch and int8 embeddings of the sample texts"""
+    reference = model.encode(VALIDATION_SENTENCES, convert_to_numpy=True, normalize_embeddings=True)
+    quantized = OnnxSentenceEncoder(output_dir).encode(VALIDATION_SENTENCES)
+    return float((reference * quantized).sum(axis=1).min())
+
+
+if __name__ == '__main__':
+    export(*sys.argv[1:2], *(Path(arg) for arg in sys.argv[2:3]))
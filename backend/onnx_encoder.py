@@ -0,0 +1,69 @@
+import onnxruntime as ort
+from tokenizers import Tokenizer
+import numpy as np
+from pathlib import Path
+from typing import List, Union
+import os
+
+# Output of export_onnx.py: tokenizer.json plus the quantized graph
+ONNX_MODEL_DIR = Path(os.environ.get(
+    'ONNX_MODEL_DIR', Path(__file__).parent / 'models' / 'all-MiniLM-L6-v2-int8'))
+ONNX_MODEL_FILE = 'model_quantized.onnx'
+
+
+class OnnxSentenceEncoder:
+    """Int8-quantized MiniLM on ONNX Runtime with SentenceTransformer's encode signature"""
+    
+    def __init__(self, model_dir: Path = ONNX_MODEL_DIR):
+        self.tokenizer = Tokenizer.from_file(str(model_dir / 'tokenizer.json'))
+        pad_id = self.tokenizer.token_to_id('[PAD]') or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token='[PAD]')
+        truncation = self.tokenizer.truncation
+        self.max_seq_length = truncation['max_length'] if truncation else 256
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_dir / ONNX_MODEL_FILE), options, providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+    
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = True,
+               show_progress_bar: bool = None, **kwargs) -> np.ndarray:
+        """
+        Mean-pooled, L2-normalized sentence embeddings
+        
+        all-MiniLM-L6-v2 ends in a Normalize module, so output is always
+        normalized; the remaining arguments are accepted for compatibility.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        
+        # Length-sorted batches keep padding, and wasted matmul work, small
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        embeddings: List[np.ndarray] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                embeddings[i] = vector
+        
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        result = np.stack(embeddings)
+        return result[0] if single else result
+    
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': attention_mask,
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        
+        # Mean pooling over real tokens, then L2 normalization
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
@@ -1,5 +1,30 @@
+import re
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, List
+
+# Hyperscan (x86 only) matches the keyword index with SIMD; use the
+# Aho-Corasick automaton where its native library is unavailable
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+    import ahocorasick
+
+
+def _deep_freeze(value: Any) -> Any:
+    """Read-only copy of a nested table: dicts become mapping proxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _deep_freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_deep_freeze(item) for item in value)
+    return value
+
+
+# Knowledge base tables are frozen at every level to prevent accidental mutation
+
 # Regulatory Knowledge Base - QCB Articles
-REGULATORY_ARTICLES = {
+REGULATORY_ARTICLES = _deep_freeze({
     "1.1.1": {
         "article": "Article 1.1.1: Mandatory Verification",
         "category": "AML",
@@ -60,10 +85,10 @@ REGULATORY_ARTICLES = {
         "requirement": "Annual external audit of all technology systems and compliance policies is mandatory",
         "keywords": ["annual audit", "external audit", "technology systems", "compliance policies", "mandatory"]
     }
-}
+})
 
 # Capital Requirements by Category
-CAPITAL_REQUIREMENTS = {
+CAPITAL_REQUIREMENTS = _deep_freeze({
     "Category 1": {
         "name": "Payment Service Provider (PSP)",
         "minimum_capital": 5000000,  # QAR 5,000,000
@@ -79,10 +104,10 @@ CAPITAL_REQUIREMENTS = {
         "minimum_capital": 4000000,  # QAR 4,000,000
         "description": "Entities offering automated investment advice (Robo-advisory) or portfolio management"
     }
-}
+})
 
 # Resource Mapping - Experts and Programs
-RESOURCE_MAPPING = {
+RESOURCE_MAPPING = _deep_freeze({
     "experts": {
         "EXPERT_C101": {
             "name": "Dr. Aisha Al-Mansoori",
@@ -113,4 +138,54 @@ RESOURCE_MAPPING = {
             "website": "https://qdb.qa/aml-workshop"
         }
     }
-}
+})
+
+# Keyword index over every article, scanned in a single pass
+_KEYWORD_INDEX = [
+    (article_id, keyword)
+    for article_id, article in REGULATORY_ARTICLES.items()
+    for keyword in article['keywords']
+]
+
+if hyperscan is not None:
+    _KEYWORD_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _KEYWORD_DB.compile(
+        expressions=[re.escape(keyword).encode() for _, keyword in _KEYWORD_INDEX],
+        ids=list(range(len(_KEYWORD_INDEX))),
+        elements=len(_KEYWORD_INDEX),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(_KEYWORD_INDEX)
+    )
+    # Scratch space may not be shared between concurrent scans
+    _scratch = threading.local()
+else:
+    _KEYWORD_AC = ahocorasick.Automaton()
+    for _index, (_, _keyword) in enumerate(_KEYWORD_INDEX):
+        _key = _keyword.lower()
+        if _key in _KEYWORD_AC:
+            _KEYWORD_AC.get(_key).append(_index)
+        else:
+            _KEYWORD_AC.add_word(_key, [_index])
+    _KEYWORD_AC.make_automaton()
+
+
+def scan(text: str) -> Dict[str, List[str]]:
+    """Map article IDs to the keywords found in text (case-insensitive)"""
+    hit_ids = set()
+    if hyperscan is not None:
+        scratch = getattr(_scratch, 'scratch', None)
+        if scratch is None:
+            scratch = _scratch.scratch = hyperscan.Scratch(_KEYWORD_DB)
+        
+        def on_match(pattern_id, start, end, flags, context):
+            hit_ids.add(pattern_id)
+        
+        _KEYWORD_DB.scan(text.encode('utf-8'), match_event_handler=on_match, scratch=scratch)
+    else:
+        for _, indices in _KEYWORD_AC.iter(text.lower()):
+            hit_ids.update(indices)
+    
+    hits = {}
+    for index in sorted(hit_ids):
+        article_id, keyword = _KEYWORD_INDEX[index]
+        hits.setdefault(article_id, []).append(keyword)
+    return hits
@@ -0,0 +1,19 @@
+from typing import Any, Dict, Iterable
+
+# Prior results looked at per upload, newest first, when reusing an assessment
+RESULT_CACHE_CANDIDATES = 5
+
+
+def _as_stored(value: Any) -> Any:
+    """Value as it reads back from MongoDB, where tuples become lists"""
+    if isinstance(value, dict):
+        return {key: _as_stored(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_stored(item) for item in value]
+    return value
+
+
+def same_inputs(cached_result: Dict, entities: Dict, document_hashes: Iterable[str]) -> bool:
+    """Whether a cached result was computed from exactly these documents and entities"""
+    return (cached_result.get('document_hashes') == sorted(document_hashes)
+            and _as_stored(cached_result.get('entities')) == _as_stored(entities))
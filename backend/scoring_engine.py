@@ -1,6 +1,9 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from collections import defaultdict
+from operator import itemgetter, mul
 import logging
 from regulatory_kb import RESOURCE_MAPPING
+from gap_analyzer import Gap
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,11 @@ class ScoringEngine:
         'Data Protection': 0.20
     }
     
+    # Fixed category order with an aligned weight vector for the overall dot product
+    _CATS = tuple(WEIGHTS)
+    _WEIGHTS_VEC = tuple(WEIGHTS.values())
+    _cat_scores = itemgetter(*_CATS)
+    
     # Severity impact on score
     SEVERITY_IMPACT = {
         'HIGH': 0.0,      # High severity = 0% compliance
@@ -23,8 +31,8 @@ class ScoringEngine:
     }
     
     @staticmethod
-    def calculate_category_scores(gaps: List[Dict]) -> Dict:
-        """Calculate compliance score for each category"""
+    def calculate_category_scores(gaps: List[Gap]) -> Tuple[Dict[str, float], Dict[str, int], Tuple[int, int, int]]:
+        """Calculate compliance score for each category, plus gap counts per category and (HIGH, MEDIUM, LOW)"""
         category_scores = {
             'Capital': 1.0,
             'Governance': 1.0,
@@ -39,28 +47,40 @@ class ScoringEngine:
             'Data Protection': 0
         }
         
-        # Calculate impact of gaps on each category
+        high = medium = low = 0
+        
+        # Hoisted locals keep attribute lookups out of the loop
+        impacts = ScoringEngine.SEVERITY_IMPACT
+        scores = category_scores
+        counts = category_gap_counts
+        
+        # Calculate impact of gaps on each category, counting severities in the same pass
         for gap in gaps:
-            category = gap['category']
-            severity = gap['severity']
+            category = gap.category
+            severity = gap.severity
+            if severity == 'HIGH':
+                high += 1
+            elif severity == 'MEDIUM':
+                medium += 1
+            elif severity == 'LOW':
+                low += 1
             
-            if category in category_scores:
-                category_gap_counts[category] += 1
-                # Each gap reduces the category score based on severity
-                impact = ScoringEngine.SEVERITY_IMPACT.get(severity, 0.5)
-                category_scores[category] = min(category_scores[category], impact)
+            if category in scores:
+                counts[category] += 1
+                # Each gap lowers the category score to its severity's impact
+                impact = impacts.get(severity, 0.5)
+                if impact < scores[category]:
+                    scores[category] = impact
         
-        return category_scores, category_gap_counts
+        return category_scores, category_gap_counts, (high, medium, low)
     
     @staticmethod
-    def calculate_overall_score(gaps: List[Dict]) -> Dict:
+    def calculate_overall_score(gaps: List[Gap]) -> Dict:
         """Calculate overall readiness score"""
-        category_scores, category_gap_counts = ScoringEngine.calculate_category_scores(gaps)
+        category_scores, category_gap_counts, (high, medium, low) = ScoringEngine.calculate_category_scores(gaps)
         
-        # Calculate weighted overall score
-        overall_score = 0.0
-        for category, weight in ScoringEngine.WEIGHTS.items():
-            overall_score += category_scores[category] * weight
+        # Calculate weighted overall score as a fixed-length dot product
+        overall_score = sum(map(mul, ScoringEngine._cat_scores(category_scores), ScoringEngine._WEIGHTS_VEC))
         
         # Convert to percentage
         overall_percentage = overall_score * 100
@@ -89,9 +109,9 @@ class ScoringEngine:
             'category_scores': {k: round(v * 100, 2) for k, v in category_scores.items()},
             'category_gap_counts': category_gap_counts,
             'total_gaps': len(gaps),
-            'high_severity_gaps': len([g for g in gaps if g['severity'] == 'HIGH']),
-            'medium_severity_gaps': len([g for g in gaps if g['severity'] == 'MEDIUM']),
-            'low_severity_gaps': len([g for g in gaps if g['severity'] == 'LOW'])
+            'high_severity_gaps': high,
+            'medium_severity_gaps': medium,
+            'low_severity_gaps': low
         }
 
 
@@ -99,51 +119,57 @@ class RecommendationEngine:
     """Generate expert and program recommendations based on gaps"""
     
     @staticmethod
-    def get_expert_recommendations(gaps: List[Dict]) -> List[Dict]:
+    def get_expert_recommendations(gaps: List[Gap]) -> List[Dict]:
         """Map gaps to expert recommendations"""
         recommendations = []
-        expert_ids = set()
         
+        # Group gap ids per expert in one pass, in first-seen order
+        by_expert = defaultdict(list)
         for gap in gaps:
-            expert_id = gap.get('expert_recommendation')
-            if expert_id and expert_id not in expert_ids:
-                expert_data = RESOURCE_MAPPING['experts'].get(expert_id)
-                if expert_data:
-                    recommendations.append({
-                        'type': 'expert',
-                        'expert_id': expert_id,
-                        'name': expert_data['name'],
-                        'specialization': expert_data['specialization'],
-                        'contact': expert_data.get('contact', 'N/A'),
-                        'relevant_articles': expert_data['article_mapping'],
-                        'relevant_gaps': [g['gap_id'] for g in gaps if g.get('expert_recommendation') == expert_id]
-                    })
-                    expert_ids.add(expert_id)
+            if gap.expert_recommendation:
+                by_expert[gap.expert_recommendation].append(gap.gap_id)
+        
+        for expert_id, gap_ids in by_expert.items():
+            expert_data = RESOURCE_MAPPING['experts'].get(expert_id)
+            if expert_data:
+                recommendations.append({
+                    'type': 'expert',
+                    'expert_id': expert_id,
+                    'name': expert_data['name'],
+                    'specialization': expert_data['specialization'],
+                    'contact': expert_data.get('contact', 'N/A'),
+                    'relevant_articles': expert_data['article_mapping'],
+                    'relevant_gaps': gap_ids
+                })
         
         return recommendations
     
     @staticmethod
-    def get_program_recommendations(gaps: List[Dict]) -> List[Dict]:
+    def get_program_recommendations(gaps: List[Gap]) -> List[Dict]:
         """Map gaps to program recommendations"""
         recommendations = []
         program_ids = set()
         
+        # Group gap ids per program in one pass, in first-seen order
+        by_program = defaultdict(list)
         for gap in gaps:
-            program_id = gap.get('program_recommendation')
-            if program_id and program_id not in program_ids:
-                program_data = RESOURCE_MAPPING['programs'].get(program_id)
-                if program_data:
-                    recommendations.append({
-                        'type': 'program',
-                        'program_id': program_id,
-                        'name': program_data['name'],
-                        'focus_areas': program_data['focus_areas'],
-                        'description': program_data['description'],
-                        'duration': program_data['duration'],
-                        'website': program_data.get('website', 'N/A'),
-                        'relevant_gaps': [g['gap_id'] for g in gaps if g.get('program_recommendation') == program_id]
-                    })
-                    program_ids.add(program_id)
+            if gap.program_recommendation:
+                by_program[gap.program_recommendation].append(gap.gap_id)
+        
+        for program_id, gap_ids in by_program.items():
+            program_data = RESOURCE_MAPPING['programs'].get(program_id)
+            if program_data:
+                recommendations.append({
+                    'type': 'program',
+                    'program_id': program_id,
+                    'name': program_data['name'],
+                    'focus_areas': program_data['focus_areas'],
+                    'description': program_data['description'],
+                    'duration': program_data['duration'],
+                    'website': program_data.get('website', 'N/A'),
+                    'relevant_gaps': gap_ids
+                })
+                program_ids.add(program_id)
         
         # Always add general accelerator program
         if 'QDB_INCUBATOR_001' not in program_ids:
@@ -162,7 +188,7 @@ class RecommendationEngine:
         return recommendations
     
     @staticmethod
-    def get_all_recommendations(gaps: List[Dict]) -> Dict:
+    def get_all_recommendations(gaps: List[Gap]) -> Dict:
         """Get all recommendations (experts + programs)"""
         return {
             'experts': RecommendationEngine.get_expert_recommendations(gaps),
@@ -1,19 +1,160 @@
-    from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
 import logging
+import os
+import sqlite3
+import threading
+import time
 from regulatory_kb import REGULATORY_ARTICLES
 
+try:
+    from onnx_encoder import OnnxSentenceEncoder, ONNX_MODEL_DIR, ONNX_MODEL_FILE
+except ImportError:  # onnxruntime not installed: stay on the PyTorch model
+    OnnxSentenceEncoder = None
+
+try:
+    from _topk_numba import topk_above
+except ImportError:  # numba not installed: fall back to numpy sorting
+    topk_above = None
+
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Persistent embedding store; bump the version when text normalization changes.
+# Vectors are derived from confidential uploads, so rows expire, the table is
+# capped, and EMBEDDING_CACHE_ENABLED=0 keeps embeddings in memory only
+EMBEDDING_CACHE_PATH = Path(os.environ.get(
+    'EMBEDDING_CACHE_PATH', Path.home() / '.cache' / 'creator_pulse' / 'embeddings.sqlite3'))
+EMBEDDING_CACHE_VERSION = 1
+EMBEDDING_CACHE_ENABLED = os.environ.get('EMBEDDING_CACHE_ENABLED', '1') != '0'
+EMBEDDING_CACHE_MAX_AGE_SECONDS = float(os.environ.get('EMBEDDING_CACHE_MAX_AGE_SECONDS', 7 * 24 * 3600))
+EMBEDDING_CACHE_MAX_ROWS = int(os.environ.get('EMBEDDING_CACHE_MAX_ROWS', 100000))
+EMBEDDING_MEMORY_ENTRIES = 4096
+
+# Characters per WordPiece token assumed when pre-truncating chunks. Once
+# whitespace is collapsed ordinary prose averages well under this, so the
+# cut lands past what the tokenizer keeps; it is a heuristic, not a bound
+# (a long unbroken string can become a single [UNK] token)
+MAX_CHARS_PER_TOKEN = 8
+
+
+class EmbeddingCache:
+    """Two-tier (in-process LRU + SQLite) store of float32 embeddings keyed by text hash"""
+    
+    def __init__(self, namespace: str, path: Path = EMBEDDING_CACHE_PATH,
+                 max_entries: int = EMBEDDING_MEMORY_ENTRIES):
+        self.namespace = f"{namespace}|v{EMBEDDING_CACHE_VERSION}|"
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if not EMBEDDING_CACHE_ENABLED:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            # Rows of the former table carry no write time, so they can't expire
+            self._db.execute("DROP TABLE IF EXISTS embeddings")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_vectors "
+                "(hash BLOB PRIMARY KEY, vec BLOB NOT NULL, created REAL NOT NULL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS embedding_vectors_created ON embedding_vectors (created)")
+            self._prune()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Embedding cache disabled on disk: {str(e)}")
+            self._db = None
+    
+    def key(self, text: str) -> bytes:
+        """Hash whitespace/case-normalized text; MiniLM's tokenizer is uncased and splits on whitespace"""
+        normalized = ' '.join(text.split()).lower()
+        return hashlib.blake2b(f"{self.namespace}{normalized}".encode('utf-8'), digest_size=16).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            
+            misses = list({key for key in keys if key not in found})
+            if self._db is not None and misses:
+                try:
+                    # Stay well under SQLite's bound-parameter limit
+                    for start in range(0, len(misses), 500):
+                        batch = misses[start:start + 500]
+                        rows = self._db.execute(
+                            f"SELECT hash, vec FROM embedding_vectors WHERE created >= ? "
+                            f"AND hash IN ({','.join('?' * len(batch))})",
+                            [time.time() - EMBEDDING_CACHE_MAX_AGE_SECONDS, *batch]).fetchall()
+                        for key, blob in rows:
+                            vector = np.frombuffer(blob, dtype=np.float32)
+                            found[key] = vector
+                            self._remember(key, vector)
+                except sqlite3.Error as e:
+                    logger.warning(f"Error reading embedding cache: {str(e)}")
+        return found
+    
+    def put_many(self, entries: Dict[bytes, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in entries.items():
+                self._remember(key, vector)
+            if self._db is not None and entries:
+                try:
+                    now = time.time()
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embedding_vectors (hash, vec, created) VALUES (?, ?, ?)",
+                        [(key, vector.tobytes(), now) for key, vector in entries.items()])
+                    self._prune()
+                except sqlite3.Error as e:
+                    logger.warning(f"Error writing embedding cache: {str(e)}")
+    
+    def _prune(self) -> None:
+        """Delete expired rows, then the oldest ones beyond the row cap, and commit"""
+        self._db.execute("DELETE FROM embedding_vectors WHERE created < ?",
+                         (time.time() - EMBEDDING_CACHE_MAX_AGE_SECONDS,))
+        self._db.execute(
+            "DELETE FROM embedding_vectors WHERE hash IN "
+            "(SELECT hash FROM embedding_vectors ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (EMBEDDING_CACHE_MAX_ROWS,))
+        self._db.commit()
+    
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
 class SemanticMapper:
     """Use semantic similarity to map document text to regulatory articles"""
     
+    # Fixed queries for entity branches that don't depend on the entity value
+    OFFICER_QUERY = "compliance officer governance board directors"
+    AML_QUERY = "AML CFT anti-money laundering policy transaction monitoring suspicious"
+    
     def __init__(self):
         # Load a lightweight semantic model
         logger.info("Loading semantic model...")
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        if OnnxSentenceEncoder is not None and (ONNX_MODEL_DIR / ONNX_MODEL_FILE).exists():
+            # Int8 export from export_onnx.py; distinct name keeps its embeddings in their own cache namespace
+            self.model_name = f"{MODEL_NAME}-onnx-int8"
+            self.model = OnnxSentenceEncoder(ONNX_MODEL_DIR)
+        else:
+            # Imported only here so ONNX deployments never load torch
+            import torch
+            from sentence_transformers import SentenceTransformer
+            torch.set_num_threads(os.cpu_count())
+            self.model_name = MODEL_NAME
+            self.model = SentenceTransformer(self.model_name)
+        self.embedding_cache = EmbeddingCache(self.model_name)
+        self.max_chunk_chars = getattr(self.model, 'max_seq_length', 256) * MAX_CHARS_PER_TOKEN
         
         # Pre-compute embeddings for all regulatory articles
         self.article_texts = []
@@ -24,11 +165,40 @@ class SemanticMapper:
             text = f"{article_data['requirement']} {' '.join(article_data['keywords'])}"
             self.article_texts.append(text)
             self.article_ids.append(article_id)
+        self.article_ids_arr = np.array(self.article_ids, dtype=object)
+        
+        # Category of each article row, and a column mask per category
+        self.article_category = np.array([REGULATORY_ARTICLES[a]['category'] for a in self.article_ids])
+        self.category_masks = {c: self.article_category == c for c in np.unique(self.article_category)}
         
         logger.info(f"Computing embeddings for {len(self.article_texts)} regulatory articles...")
-        self.article_embeddings = self.model.encode(self.article_texts)
+        # One contiguous float32 matrix of L2-normalized rows, so cosine similarity
+        # reduces to a dot product that feeds SGEMM/SGEMV without copies
+        self.article_embeddings = np.ascontiguousarray(
+            self._encode(self.article_texts, batch_size=64), dtype=np.float32)
+        self._officer_emb, self._aml_emb = self._encode([self.OFFICER_QUERY, self.AML_QUERY])
         logger.info("Semantic mapper initialized successfully")
     
+    def _encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts into L2-normalized float32 embeddings, running only cache misses through the model"""
+        keys = [self.embedding_cache.key(text) for text in texts]
+        vectors = self.embedding_cache.get_many(keys)
+        
+        # Repeated texts within one call are encoded once
+        pending = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if pending:
+            encoded = self.model.encode(list(pending.values()), batch_size=batch_size, convert_to_numpy=True,
+                                        normalize_embeddings=True, show_progress_bar=False)
+            fresh = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(pending, encoded)}
+            self.embedding_cache.put_many(fresh)
+            vectors.update(fresh)
+        
+        return np.stack([vectors[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+    
+    def _similarities(self, embeddings: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each normalized embedding row against every article"""
+        return embeddings @ self.article_embeddings.T
+    
     def map_text_to_articles(self, text: str, threshold: float = 0.3) -> List[Tuple[str, float]]:
         """
         Map document text to relevant regulatory articles using semantic similarity
@@ -40,20 +210,34 @@ class SemanticMapper:
         Returns:
             List of (article_id, similarity_score) tuples
         """
-        # Encode the input text
-        text_embedding = self.model.encode([text])[0]
-        
-        # Calculate cosine similarity with all articles
-        similarities = cosine_similarity([text_embedding], self.article_embeddings)[0]
+        # Query embedding is already unit-length, so one SGEMV gives all cosine scores
+        similarities = self.article_embeddings @ self._encode([text])[0]
         
         # Filter by threshold and sort by similarity
-        results = []
-        for article_id, similarity in zip(self.article_ids, similarities):
-            if similarity >= threshold:
-                results.append((article_id, float(similarity)))
-        
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        if topk_above is not None:
+            # Threshold as float32 so the comparison matches numpy's on the float32 scores
+            indices, scores = topk_above(similarities, np.float32(threshold), len(self.article_ids))
+            return list(zip(self.article_ids_arr[indices].tolist(), scores.tolist()))
+        order = np.argsort(-similarities, kind='stable')
+        return [(self.article_ids[i], float(similarities[i])) for i in order if similarities[i] >= threshold]
+    
+    def _articles_from_embedding(self, embedding: np.ndarray, threshold: float,
+                                 category: Optional[str] = None) -> List[str]:
+        """Article ids scoring >= threshold against a normalized embedding, best first"""
+        similarities = self.article_embeddings @ embedding
+        mask = similarities >= np.float32(threshold)
+        if category is not None:
+            mask &= self.category_masks.get(category, False)
+        order = np.argsort(-similarities, kind='stable')
+        return self.article_ids_arr[order[mask[order]]].tolist()
+    
+    @staticmethod
+    def _ranked_matches(mask: np.ndarray, similarities: np.ndarray) -> List[Tuple[int, int, float]]:
+        """(row, column, score) of masked entries, ordered by row then descending score"""
+        rows, cols = np.nonzero(mask)
+        scores = similarities[rows, cols]
+        order = np.lexsort((-scores, rows))
+        return list(zip(rows[order].tolist(), cols[order].tolist(), scores[order].tolist()))
     
     def analyze_document_semantically(self, document_text: str) -> Dict[str, List[Tuple[str, float]]]:
         """
@@ -65,6 +249,11 @@ class SemanticMapper:
         # Split document into meaningful chunks (paragraphs)
         chunks = [p.strip() for p in document_text.split('\n\n') if len(p.strip()) > 50]
         
+        # Skip tokenizing the tail of long paragraphs that would be truncated anyway;
+        # whitespace runs are collapsed first (the tokenizer splits on them) so
+        # they can't push real text out of the kept prefix
+        encode_texts = [' '.join(chunk.split())[:self.max_chunk_chars] for chunk in chunks]
+        
         category_matches = {
             'AML': [],
             'Data Protection': [],
@@ -72,14 +261,23 @@ class SemanticMapper:
             'Capital': []
         }
         
-        # Analyze each chunk
-        for chunk in chunks:
-            matches = self.map_text_to_articles(chunk, threshold=0.25)
-            
-            for article_id, score in matches:
-                category = REGULATORY_ARTICLES[article_id]['category']
-                if category in category_matches:
-                    category_matches[category].append((article_id, score, chunk[:100]))
+        if not chunks:
+            return category_matches
+        
+        # Score each distinct chunk once (boilerplate repeats), then expand back to document order
+        unique_texts = list(dict.fromkeys(encode_texts))
+        position = {text: i for i, text in enumerate(unique_texts)}
+        unique_similarities = self._similarities(self._encode(unique_texts))
+        similarities = unique_similarities[[position[text] for text in encode_texts]]
+        
+        # Fan out per category with column masks
+        above = similarities >= 0.25
+        for category, matches in category_matches.items():
+            column_mask = self.category_masks.get(category)
+            if column_mask is None:
+                continue
+            for row, col, score in self._ranked_matches(above & column_mask, similarities):
+                matches.append((self.article_ids[col], score, chunks[row][:100]))
         
         return category_matches
     
@@ -97,10 +295,8 @@ class SemanticMapper:
         # Data location mentions -> Data Protection articles
         if entities.get('data_locations'):
             locations_text = ' '.join(entities['data_locations'])
-            matches = self.map_text_to_articles(locations_text, threshold=0.2)
-            for article_id, score in matches:
-                if REGULATORY_ARTICLES[article_id]['category'] == 'Data Protection':
-                    relevant_articles['data_residency'].append(article_id)
+            relevant_articles['data_residency'] = self._articles_from_embedding(
+                self._encode([locations_text])[0], 0.2, 'Data Protection')
         
         # Capital mentions -> Capital articles
         if entities.get('capital'):
@@ -110,18 +306,10 @@ class SemanticMapper:
         
         # Compliance officer -> Governance articles
         if entities.get('compliance_officer'):
-            officer_text = "compliance officer governance board directors"
-            matches = self.map_text_to_articles(officer_text, threshold=0.2)
-            for article_id, score in matches:
-                if REGULATORY_ARTICLES[article_id]['category'] == 'Governance':
-                    relevant_articles['governance'].append(article_id)
+            relevant_articles['governance'] = self._articles_from_embedding(self._officer_emb, 0.2, 'Governance')
         
         # AML policy -> AML articles
         if entities.get('aml_policy'):
-            aml_text = "AML CFT anti-money laundering policy transaction monitoring suspicious"
-            matches = self.map_text_to_articles(aml_text, threshold=0.2)
-            for article_id, score in matches:
-                if REGULATORY_ARTICLES[article_id]['category'] == 'AML':
-                    relevant_articles['aml'].append(article_id)
+            relevant_articles['aml'] = self._articles_from_embedding(self._aml_emb, 0.2, 'AML')
         
         return relevant_articles
@@ -1,4 +1,6 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -9,24 +11,33 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Dict, Optional
 import uuid
 from datetime import datetime, timezone
-import shutil
-import tempfile
+import hashlib
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Import our custom modules
 from document_parser import DocumentParser, EntityExtractor
 from gap_analyzer import GapAnalyzer
 from scoring_engine import ScoringEngine, RecommendationEngine
 from semantic_mapper import SemanticMapper
+from result_cache import RESULT_CACHE_CANDIDATES, same_inputs
 
-# Initialize semantic mapper (lazy loading)
-_semantic_mapper = None
+def _new_parse_pool() -> ProcessPoolExecutor:
+    # Workers come from a forkserver rather than forking this process, whose
+    # threadpool threads and torch/onnxruntime state do not survive a fork
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context('forkserver')
+    )
 
-def get_semantic_mapper():
-    global _semantic_mapper
-    if _semantic_mapper is None:
-        logger.info("Initializing semantic mapper...")
-        _semantic_mapper = SemanticMapper()
-    return _semantic_mapper
+# Worker processes shared by all uploads; parsing is CPU-bound and holds the GIL.
+# A worker that dies (native crash, OOM kill) breaks the whole executor, so
+# it is replaced through _replace_parse_pool
+PARSE_POOL = _new_parse_pool()
+_PARSE_POOL_LOCK = threading.Lock()
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -37,7 +48,8 @@ client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI(title="FinRegX - Smart Regulatory Readiness Platform")
+# orjson serializes the large nested assessment results several times faster than json
+app = FastAPI(title="FinRegX - Smart Regulatory Readiness Platform", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -104,8 +116,107 @@ async def create_assessment(input: AssessmentCreate):
     await db.assessments.insert_one(doc)
     return assessment
 
+def _replace_parse_pool(broken: ProcessPoolExecutor) -> None:
+    """Swap in a fresh pool for a broken one; concurrent callers replace it only once"""
+    global PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if PARSE_POOL is broken:
+            PARSE_POOL = _new_parse_pool()
+            broken.shutdown(wait=False, cancel_futures=True)
+
+def _parse_in_pool(pool: ProcessPoolExecutor, contents: List) -> Dict[str, str]:
+    """Parse (filename, bytes) pairs in the pool, skipping documents that fail to parse"""
+    parsed_documents = {}
+    futures = {
+        filename: pool.submit(DocumentParser.parse_stream, io.BytesIO(data), filename)
+        for filename, data in contents
+    }
+    for filename, future in futures.items():
+        try:
+            parsed_documents[filename] = future.result()
+        except BrokenProcessPool:
+            # Not a parse error: every result of a broken pool is lost
+            raise
+        except Exception as e:
+            logger.error(f"Error parsing {filename}: {str(e)}")
+    return parsed_documents
+
+def _process_upload_sync(uploads: List):
+    """Parse uploaded streams and extract entities; blocking, so run it in the threadpool"""
+    # Upload streams can't cross the process boundary, so their bytes are sent instead
+    contents = [(filename, fileobj.read()) for filename, fileobj in uploads]
+    document_hashes = [hashlib.sha256(data).hexdigest() for _, data in contents]
+    
+    # Retry once on a fresh pool, in case an earlier upload broke this one;
+    # a second crash is most likely caused by these documents
+    for attempt in range(2):
+        pool = PARSE_POOL
+        try:
+            parsed_documents = _parse_in_pool(pool, contents)
+            break
+        except BrokenProcessPool as e:
+            logger.error(f"Parse worker died, restarting the pool: {str(e)}")
+            _replace_parse_pool(pool)
+    else:
+        raise HTTPException(status_code=503, detail="Document parsing crashed; the documents could not be analyzed")
+    
+    # Extract entities
+    entities = EntityExtractor.extract_all_entities(parsed_documents)
+    return parsed_documents, entities, sorted(document_hashes)
+
+def _run_assessment_pipeline(semantic_mapper: SemanticMapper, assessment_id: str, assessment: Dict,
+                             entities: Dict, parsed_documents: Dict[str, str], uploaded_files: List[str]) -> Dict:
+    """Semantic mapping, gap analysis, scoring and recommendations for one upload"""
+    # Perform semantic analysis (RAG)
+    logger.info("Performing semantic regulatory mapping...")
+    combined_text = "\n\n".join(parsed_documents.values())
+    semantic_analysis = semantic_mapper.analyze_document_semantically(combined_text)
+    relevant_articles = semantic_mapper.get_relevant_articles_for_entities(entities)
+    
+    # Analyze gaps
+    gaps = GapAnalyzer.analyze_all_gaps(entities)
+    
+    # Calculate score
+    score = ScoringEngine.calculate_overall_score(gaps)
+    
+    # Hybrid vetting: Flag for expert review if score is critically low
+    needs_expert_review = score['overall_score'] < 50 or score['high_severity_gaps'] >= 3
+    expert_review_reason = None
+    if needs_expert_review:
+        if score['overall_score'] < 25:
+            expert_review_reason = "Critical readiness score - comprehensive expert review required"
+        elif score['high_severity_gaps'] >= 4:
+            expert_review_reason = f"Multiple high-severity gaps detected ({score['high_severity_gaps']} gaps)"
+        else:
+            expert_review_reason = "Low readiness score - expert validation recommended"
+    
+    # Get recommendations
+    recommendations = RecommendationEngine.get_all_recommendations(gaps)
+    
+    return {
+        "assessment_id": assessment_id,
+        "startup_name": assessment['startup_name'],
+        "entities": entities,
+        "semantic_analysis": {
+            "article_matches": semantic_analysis,
+            "relevant_articles": relevant_articles
+        },
+        "gaps": [gap.to_dict() for gap in gaps],
+        "score": score,
+        "recommendations": recommendations,
+        "hybrid_vetting": {
+            "needs_expert_review": needs_expert_review,
+            "review_reason": expert_review_reason,
+            "confidence_level": "HIGH" if score['overall_score'] > 70 else "MEDIUM" if score['overall_score'] > 40 else "LOW"
+        },
+        "documents_analyzed": uploaded_files,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "completed_at": datetime.now(timezone.utc).isoformat()
+    }
+
 @api_router.post("/assessments/{assessment_id}/upload")
 async def upload_documents(
+    request: Request,
     assessment_id: str,
     files: List[UploadFile] = File(...)
 ):
@@ -116,80 +227,39 @@ async def upload_documents(
         if not assessment:
             raise HTTPException(status_code=404, detail="Assessment not found")
         
-        # Create temp directory for uploads
-        temp_dir = tempfile.mkdtemp()
-        uploaded_files = []
-        parsed_documents = {}
-        
-        # Save and parse each file
-        for file in files:
-            if not file.filename.lower().endswith(('.pdf', '.docx')):
-                continue
-                
-            file_path = os.path.join(temp_dir, file.filename)
-            with open(file_path, 'wb') as f:
-                shutil.copyfileobj(file.file, f)
-            
-            uploaded_files.append(file.filename)
-            
-            # Parse document
-            try:
-                text = DocumentParser.parse_document(file_path)
-                parsed_documents[file.filename] = text
-            except Exception as e:
-                logger.error(f"Error parsing {file.filename}: {str(e)}")
+        # Supported uploads are parsed straight from their spooled streams
+        uploads = [
+            (file.filename, file.file) for file in files
+            if file.filename.lower().endswith(('.pdf', '.docx'))
+        ]
+        uploaded_files = [filename for filename, _ in uploads]
         
-        # Extract entities
-        entities = EntityExtractor.extract_all_entities(parsed_documents)
+        # Parse documents and extract entities off the event loop
+        parsed_documents, entities, document_hashes = await run_in_threadpool(_process_upload_sync, uploads)
         
-        # Perform semantic analysis (RAG)
-        logger.info("Performing semantic regulatory mapping...")
-        semantic_mapper = get_semantic_mapper()
-        combined_text = "\n\n".join(parsed_documents.values())
-        semantic_analysis = semantic_mapper.analyze_document_semantically(combined_text)
-        relevant_articles = semantic_mapper.get_relevant_articles_for_entities(entities)
+        # Reuse a prior result computed from exactly these documents and entities
+        candidates = await db.results.find(
+            {"document_hashes": document_hashes}, {"_id": 0}
+        ).sort("created_at", -1).to_list(RESULT_CACHE_CANDIDATES)
+        cached_result = next(
+            (candidate for candidate in candidates if same_inputs(candidate, entities, document_hashes)), None)
         
-        # Analyze gaps
-        gaps = GapAnalyzer.analyze_all_gaps(entities)
-        
-        # Calculate score
-        score = ScoringEngine.calculate_overall_score(gaps)
-        
-        # Hybrid vetting: Flag for expert review if score is critically low
-        needs_expert_review = score['overall_score'] < 50 or score['high_severity_gaps'] >= 3
-        expert_review_reason = None
-        if needs_expert_review:
-            if score['overall_score'] < 25:
-                expert_review_reason = "Critical readiness score - comprehensive expert review required"
-            elif score['high_severity_gaps'] >= 4:
-                expert_review_reason = f"Multiple high-severity gaps detected ({score['high_severity_gaps']} gaps)"
-            else:
-                expert_review_reason = "Low readiness score - expert validation recommended"
-        
-        # Get recommendations
-        recommendations = RecommendationEngine.get_all_recommendations(gaps)
-        
-        # Save results
-        result = {
-            "assessment_id": assessment_id,
-            "startup_name": assessment['startup_name'],
-            "entities": entities,
-            "semantic_analysis": {
-                "article_matches": semantic_analysis,
-                "relevant_articles": relevant_articles
-            },
-            "gaps": gaps,
-            "score": score,
-            "recommendations": recommendations,
-            "hybrid_vetting": {
-                "needs_expert_review": needs_expert_review,
-                "review_reason": expert_review_reason,
-                "confidence_level": "HIGH" if score['overall_score'] > 70 else "MEDIUM" if score['overall_score'] > 40 else "LOW"
-            },
-            "documents_analyzed": uploaded_files,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "completed_at": datetime.now(timezone.utc).isoformat()
-        }
+        if cached_result is not None:
+            logger.info(f"Result cache hit: reusing results of assessment {cached_result['assessment_id']}")
+            result = {
+                **cached_result,
+                "assessment_id": assessment_id,
+                "startup_name": assessment['startup_name'],
+                "documents_analyzed": uploaded_files,
+                "cached_from": cached_result['assessment_id'],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "completed_at": datetime.now(timezone.utc).isoformat()
+            }
+        else:
+            semantic_mapper = request.app.state.semantic_mapper
+            result = await run_in_threadpool(
+                _run_assessment_pipeline, semantic_mapper, assessment_id, assessment, entities, parsed_documents, uploaded_files)
+            result['document_hashes'] = document_hashes
         
         await db.results.insert_one(result)
         
@@ -202,17 +272,14 @@ async def upload_documents(
             }}
         )
         
-        # Clean up temp files
-        shutil.rmtree(temp_dir)
-        
         return {
             "message": "Documents uploaded and analyzed successfully",
             "assessment_id": assessment_id,
             "files_uploaded": len(uploaded_files),
-            "gaps_detected": len(gaps),
-            "readiness_score": score['overall_score']
+            "gaps_detected": len(result['gaps']),
+            "readiness_score": result['score']['overall_score']
         }
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -262,10 +329,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+def load_semantic_mapper():
+    # Load and warm the model before serving, so the first upload doesn't pay the cold start
+    logger.info("Initializing semantic mapper...")
+    semantic_mapper = SemanticMapper()
+    semantic_mapper.model.encode(["warmup"])
+    app.state.semantic_mapper = semantic_mapper
+
+@app.on_event("startup")
+async def create_db_indexes():
+    # Point lookups by assessment id, the created_at listing sort and result
+    # reuse by document hashes; each index is created on its own so one
+    # failure doesn't leave the others missing
+    indexes = [
+        ("assessments", "id", {"unique": True}),
+        ("assessments", [("created_at", -1)], {}),
+        ("results", "assessment_id", {}),
+        ("results", [("document_hashes", 1), ("created_at", -1)], {})
+    ]
+    for collection, keys, options in indexes:
+        try:
+            await db[collection].create_index(keys, **options)
+        except Exception as e:
+            logger.error(f"Error creating index {keys} on {collection}: {str(e)}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
 
+@app.on_event("shutdown")
+async def shutdown_parse_pool():
+    PARSE_POOL.shutdown(cancel_futures=True)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
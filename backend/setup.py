@@ -0,0 +1,14 @@
+"""Optional mypyc build of the entity extraction module.
+
+Build in place so the compiled extension shadows document_parser.py:
+
+    python setup.py build_ext --inplace
+"""
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name='finregx-backend-native',
+    py_modules=[],
+    ext_modules=mypycify(['--ignore-missing-imports', 'document_parser.py']),
+)
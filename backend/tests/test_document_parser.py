@@ -0,0 +1,51 @@
+import io
+
+from document_parser import EntityExtractor, parse_pdf
+
+
+def _pdf(pages):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+    
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def test_overlapping_anchors_do_not_hide_each_other():
+    # "data" ends on the "a" that starts "aml"; both anchors must be seen
+    entities = EntityExtractor.extract_all_entities({'a': 'metadataml data policy'})
+    assert entities['aml_policy']['has_policy'] is True
+
+
+def test_absent_anchors_give_empty_results():
+    entities = EntityExtractor.extract_all_entities({'a': 'Nothing relevant here.'})
+    assert entities['capital'] is None
+    assert entities['data_locations'] is None
+    assert entities['compliance_officer'] == {'has_officer': False, 'details': None}
+    assert entities['aml_policy']['has_policy'] is False
+
+
+def test_pdf_pages_are_separated_by_a_blank_line():
+    # Semantic analysis chunks on blank lines, so pages must not run together
+    data = _pdf(["Page one text", "Page two text"])
+    text = parse_pdf(data)
+    assert text.split('\n\n') == ["Page one text", "Page two text\n"]
@@ -0,0 +1,18 @@
+from document_parser import EntityExtractor
+from gap_analyzer import GapAnalyzer
+
+
+def _residency_gap(text):
+    entities = EntityExtractor.extract_all_entities({'a': text})
+    return GapAnalyzer.analyze_data_residency(entities)
+
+
+def test_qatari_data_centres_are_in_qatar():
+    assert _residency_gap("Customer data is stored in Qatari data centres.") is None
+
+
+def test_foreign_locations_are_reported_as_written():
+    gap = _residency_gap("Customer data is stored in Ireland.")
+    assert gap.gap_id == 'GAP_DATA_001'
+    assert gap.status == 'VIOLATION'
+    assert gap.description.endswith('Found locations: Ireland')
@@ -0,0 +1,32 @@
+from result_cache import same_inputs
+
+ENTITIES = {
+    'capital': {'paid_up_capital': 8000000.0, 'authorized_capital': None},
+    'data_locations': ('Ireland', 'Qatar'),
+    'business_category': 'Category 2'
+}
+
+
+def _stored(entities, document_hashes):
+    # MongoDB hands tuples back as lists
+    return {
+        'entities': {**entities, 'data_locations': list(entities['data_locations'])},
+        'document_hashes': sorted(document_hashes)
+    }
+
+
+def test_identical_inputs_match_after_a_round_trip():
+    assert same_inputs(_stored(ENTITIES, ['b', 'a']), ENTITIES, ['a', 'b'])
+
+
+def test_different_entities_do_not_match():
+    entities = {**ENTITIES, 'capital': {'paid_up_capital': 800000.0, 'authorized_capital': None}}
+    assert not same_inputs(_stored(ENTITIES, ['a']), entities, ['a'])
+
+
+def test_different_documents_do_not_match():
+    assert not same_inputs(_stored(ENTITIES, ['a']), ENTITIES, ['a', 'b'])
+
+
+def test_results_without_document_hashes_do_not_match():
+    assert not same_inputs({'entities': ENTITIES}, ENTITIES, [])